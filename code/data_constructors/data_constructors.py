@@ -29,7 +29,9 @@ Module functions:
 
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import datetime as dt
+import functools
 import logging
 import numpy as np
 import pandas as pd
@@ -54,7 +56,12 @@ VAR_METADATA_SUBSET = [
     ]
 STATISTIC_ALIASES = {'average': 'Avg', 'variance': 'Vr', 'sum': 'Tot'}
 TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+NC_DIMS = ['time', 'latitude', 'longitude']
+QC_FLAG_ENCODING = {'dtype': 'i1', 'zlib': True, 'complevel': 1}
+DATA_VAR_ENCODING = {'zlib': True, 'complevel': 4, 'shuffle': True}
 MERGED_FILE_NAME = '<site>_merged_std.dat'
+TOA5_CONFIGS = io.FILE_CONFIGS['TOA5']
+MERGE_MAX_WORKERS = 8
 # CONSTRAIN_SITES_TO_FLUX = ['CumberlandPlain']
 logger = logging.getLogger(__name__)
 #------------------------------------------------------------------------------
@@ -87,7 +94,7 @@ class L1DataConstructor():
 
         self.site = site
         if md_mngr is None:
-            md_mngr = mh.MetaDataManager(site=site)
+            md_mngr = mh.get_metadata_manager(site=site)
         self.md_mngr = md_mngr
 
         # Merge the raw data (no corrections applied)
@@ -99,8 +106,19 @@ class L1DataConstructor():
             merge_data(files=merge_dict, concat_files=concat_files)
             ['data']
             )
-        self.data_years = self.data.index.year.unique().tolist()
+        self.data_years = (
+            np.unique(self.data.index.to_numpy().astype('datetime64[Y]'))
+            .astype(int) + 1970
+            ).tolist()
+        self._null_flags = None
+        self._variable_attrs = None
         self.global_attrs = self._get_site_global_attrs()
+        self.dim_attrs = io.read_yml(
+            file=pm.get_local_stream_path(
+                resource='configs', 
+                stream='nc_dim_attrs'
+                )
+            )
         self.io_path = pm.get_local_stream_path(
             resource='homogenised_data', stream='nc', subdirs=[site]
             )
@@ -130,13 +148,13 @@ class L1DataConstructor():
             }
         global_attrs.update(new_dict)
 
-        site_specific_attrs = (
+        global_attrs.update(
             self.md_mngr.get_site_details()
             [SITE_DETAIL_SUBSET]
             .rename(SITE_DETAIL_ALIASES)
             .to_dict()
             )
-        return global_attrs | site_specific_attrs
+        return global_attrs
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -149,7 +167,7 @@ class L1DataConstructor():
 
         """
 
-        return self._build_xarray_dataset(df=self.data)
+        return self._build_xarray_dataset()
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -173,16 +191,8 @@ class L1DataConstructor():
 
         if start_date is None and end_date is None:
             return self.build_xarray_dataset_complete()
-        if start_date is None:
-            return self._build_xarray_dataset(
-                df=self.data.loc[: end_date]
-                )
-        if end_date is None:
-            return self._build_xarray_dataset(
-                df=self.data.loc[start_date:]
-                )
         return self._build_xarray_dataset(
-            df=self.data.loc[start_date: end_date]
+            rows=self._get_row_slice(start_date=start_date, end_date=end_date)
             )
     #--------------------------------------------------------------------------
 
@@ -210,10 +220,33 @@ class L1DataConstructor():
             time_step=self.global_attrs['time_step']
             )
         return self._build_xarray_dataset(
-            df=self.data.loc[bounds[0]: bounds[1]]
+            rows=self._get_row_slice(start_date=bounds[0], end_date=bounds[1])
             )
     #--------------------------------------------------------------------------
 
+    #--------------------------------------------------------------------------
+    def _get_row_slice(
+            self, start_date: dt.datetime | str=None,
+            end_date: dt.datetime | str=None
+            ) -> slice:
+        """
+        Get the positional slice of the data between two dates (inclusive).
+
+        Args:
+            start_date (optional): the start date for the slice. If None,
+            starts at the beginning of the merged dataset. Defaults to None.
+            end_date (optional): the end date for the slice. If None,
+            ends at the end of the merged dataset. Defaults to None.
+
+        Returns:
+            The slice (the merged data index is monotonic, so the bounds are
+            found by binary search and no rows are copied).
+
+        """
+
+        return self.data.index.slice_indexer(start_date, end_date)
+    #--------------------------------------------------------------------------
+
     #--------------------------------------------------------------------------
     def _get_year_bounds(self, year: int, time_step: int) -> dict:
         """
@@ -238,37 +271,44 @@ class L1DataConstructor():
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
-    def _build_xarray_dataset(self, df: pd.core.frame.DataFrame) -> xr.Dataset:
+    def _build_xarray_dataset(self, rows: slice=slice(None)) -> xr.Dataset:
         """
-        Convert the dataframe to an xarray dataset and apply global attributes.
+        Convert the data to an xarray dataset and apply global attributes.
 
         Args:
-            df: the dataframe to convert to xr dataset.
+            rows (optional): the positional slice of the data to convert to
+            xr dataset. Defaults to all rows.
 
         Returns:
             ds: xarray dataset.
 
         """
 
-        # Create xarray dataset
-        ds = (
-            df.assign(
-                latitude=self.global_attrs['latitude'],
-                longitude=self.global_attrs['longitude']
-                )
-            .reset_index()
-            .rename({'DATETIME': 'time'}, axis=1)
-            .set_index(keys=['time', 'latitude', 'longitude'])
-            .to_xarray()
+        df = self.data.iloc[rows]
+
+        # Create xarray dataset (latitude and longitude are single-valued, so
+        # each column just gets two length-1 trailing dimensions - no need to
+        # build and unstack a multiindex)
+        ds = xr.Dataset(
+            data_vars={
+                col: (NC_DIMS, series.to_numpy().reshape(-1, 1, 1))
+                for col, series in df.items()
+                },
+            coords={
+                'time': df.index.to_numpy(),
+                'latitude': [self.global_attrs['latitude']],
+                'longitude': [self.global_attrs['longitude']]
+                }
             )
 
         # Assign global and variable attrs and flags
         self._assign_global_attrs(ds=ds)
         self._assign_dim_attrs(ds=ds)
         self._set_dim_encoding(ds=ds)
+        self._set_variable_encoding(ds=ds)
         self._assign_variable_attrs(ds=ds)
+        self._assign_variable_flags(ds=ds, rows=rows)
         self._assign_crs_var(ds=ds)
-        self._assign_variable_flags(ds=ds)
 
         return ds
     #--------------------------------------------------------------------------
@@ -290,16 +330,17 @@ class L1DataConstructor():
         # Get time info to add to global attrs (note that year is lagged
         # by one time interval because the timestamps are named for the END of
         # the measurement period)
-        func = lambda x: pd.to_datetime(x).strftime(TIME_FORMAT)
+        func = lambda x: pd.Timestamp(x).strftime(TIME_FORMAT)
         year_list = (
-            (
-                pd.to_datetime(ds.time.values) -
-                dt.timedelta(minutes=self.global_attrs['time_step'])
+            np.unique(
+                (
+                    ds.time.values -
+                    np.timedelta64(int(self.global_attrs['time_step']), 'm')
+                    )
+                .astype('datetime64[Y]')
                 )
-            .year
-            .unique()
+            .astype(int) + 1970
             )
-        # pd.to_datetime(ds.time.values).year.unique()
         year_str = ''
         if len(year_list) == 1:
             year_str = f' for the calendar year {year_list[0]}'
@@ -342,14 +383,8 @@ class L1DataConstructor():
 
         """
 
-        dim_attrs = io.read_yml(
-            file=pm.get_local_stream_path(
-                resource='configs', 
-                stream='nc_dim_attrs'
-                )
-            )
         for dim in ds.dims:
-            ds[dim].attrs = dim_attrs[dim]
+            ds[dim].attrs = self.dim_attrs[dim]
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -368,6 +403,24 @@ class L1DataConstructor():
         ds.time.encoding['units']='days since 1800-01-01 00:00:00.0'
     #--------------------------------------------------------------------------
 
+    #--------------------------------------------------------------------------
+    def _set_variable_encoding(self, ds: xr.Dataset):
+        """
+        Apply compression encoding to the data variables (values are written
+        at their native precision).
+
+        Args:
+            ds: xarray dataset.
+
+        Returns:
+            None.
+
+        """
+
+        for var in ds.data_vars:
+            ds[var].encoding.update(DATA_VAR_ENCODING)
+    #--------------------------------------------------------------------------
+
     #--------------------------------------------------------------------------
     def _assign_variable_attrs(self, ds: xr.Dataset):
         """
@@ -382,18 +435,27 @@ class L1DataConstructor():
 
         """
 
-        var_list = [var for var in ds.variables if not var in ds.dims]
-        for var in var_list:
-            ds[var].attrs = (
-                self.md_mngr.get_variable_attributes(variable=var)
+        # Look up the attributes for all variables in one go on first call
+        # (each metadata manager lookup rebuilds its translation table)
+        if self._variable_attrs is None:
+            self._variable_attrs = (
+                self.md_mngr.get_variable_attributes(
+                    variable=self.data.columns.tolist()
+                    )
                 [VAR_METADATA_SUBSET]
+                .to_dict(orient='index')
                 )
+        var_list = [var for var in ds.variables if not var in ds.dims]
+        for var in var_list:
+            ds[var].attrs = self._variable_attrs[var]
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
     def _assign_crs_var(self, ds: xr.Dataset):
         """
-        Assign coordinate reference system variable.
+        Assign coordinate reference system variable (CF grid mapping
+        variables carry their information in their attributes, so a scalar
+        is sufficient).
 
         Args:
             ds: xarray dataset.
@@ -403,39 +465,53 @@ class L1DataConstructor():
 
         """
 
-        dim_attrs = io.read_yml(
-            file=pm.get_local_stream_path(
-                resource='configs', 
-                stream='nc_dim_attrs'
-                )
-            )
         ds['crs'] = (
-            ['time', 'latitude', 'longitude'],
-            np.tile(np.nan, (len(ds.time), 1, 1)),
-            dim_attrs['coordinate_reference_system']
+            [],
+            np.int8(0),
+            self.dim_attrs['coordinate_reference_system']
             )
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
-    def _assign_variable_flags(self, ds: xr.Dataset):
+    def _assign_variable_flags(self, ds: xr.Dataset, rows: slice):
         """
         Assign the variable QC flags to the existing dataset.
 
         Args:
             ds: xarray dataset.
+            rows: the positional slice of the data contained in the dataset.
 
         Returns:
             None.
 
         """
 
-        var_list = [var for var in ds.variables if not var in ds.dims]
-        for var in var_list:
+        flags = self._get_null_flags()[:, rows]
+        for var, var_flags in zip(self.data.columns, flags):
             ds[f'{var}_QCFlag'] = (
-                ['time', 'latitude', 'longitude'],
-                pd.isnull(ds[var]).astype(int),
+                NC_DIMS,
+                var_flags.reshape(-1, 1, 1),
                 {'long_name': f'{var}QC flag', 'units': '1'}
                 )
+            ds[f'{var}_QCFlag'].encoding = QC_FLAG_ENCODING.copy()
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _get_null_flags(self) -> np.ndarray:
+        """
+        Get the null flags for the complete data record (computed on first
+        call only, so that writing multiple datasets doesn't repeat the pass).
+
+        Returns:
+            int8 array with one contiguous row of flags per variable.
+
+        """
+
+        if self._null_flags is None:
+            self._null_flags = np.ascontiguousarray(
+                self.data.isna().to_numpy().T, dtype=np.int8
+                )
+        return self._null_flags
     #--------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -476,8 +552,8 @@ def write_nc_file(site: str, split_by_year: bool=True):
         ds = data_builder.build_xarray_dataset_by_year(year=year)
         file_out_path = data_builder.io_path / f'{site}_{year}_L1.nc'
         if file_out_path.exists():
-            raise FileExistsError('File already created for year {year}!')
-        ds.to_netcdf(path=data_builder.io_path / f'{site}_{year}_L1.nc', mode='w')
+            raise FileExistsError(f'File already created for year {year}!')
+        ds.to_netcdf(path=file_out_path, mode='w')
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -512,10 +588,8 @@ def write_nc_year_file(site: str, year: int=None, overwrite: bool=False) -> None
     data_builder = L1DataConstructor(site=site, concat_files=True)
     if not year in data_builder.data_years:
         raise IndexError('No data available for current data year!')
-    output_path = data_builder.io_path / f'{site}_{year}_L1.nc'
     ds = data_builder.build_xarray_dataset_by_year(year=year)
-    output_path = data_builder.io_path / f'{site}_{year}_L1.nc'
-    ds.to_netcdf(path=output_path, mode='w')
+    ds.to_netcdf(path=expected_file, mode='w')
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -559,7 +633,7 @@ def append_to_nc_file(site: str, nc_file: pathlib.Path | str):
 
     ds = xr.open_dataset(nc_file)
     last_nc_date = pd.Timestamp(ds.time.values[-1]).to_pydatetime()
-    md_mngr = mh.MetaDataManager(site=site)
+    md_mngr = mh.get_metadata_manager(site=site)
     last_raw_date = min(
         [
             md_mngr.get_file_attributes(file=file, return_field='end_date') 
@@ -574,7 +648,21 @@ def append_to_nc_file(site: str, nc_file: pathlib.Path | str):
     new_ds = data_builder.build_xarray_dataset_by_slice(
         start_date=data_builder.data.index[date_iloc]
         )
-    combined_ds = xr.concat([ds, new_ds], dim='time', combine_attrs='override')
+
+    # Drop crs (and the crs_QCFlag of files written when crs was a
+    # time-dimensioned variable) before concatenating, then re-add it as a
+    # scalar; only variables with a time dimension are concatenated
+    crs_vars = ['crs', 'crs_QCFlag']
+    combined_ds = xr.concat(
+        [
+            ds.drop_vars(crs_vars, errors='ignore'),
+            new_ds.drop_vars(crs_vars, errors='ignore')
+            ],
+        dim='time',
+        data_vars='minimal',
+        combine_attrs='override'
+        )
+    data_builder._assign_crs_var(ds=combined_ds)
     ds.close()
     combined_ds.attrs['time_coverage_end'] = (
         pd.to_datetime(combined_ds.time.values[-1])
@@ -744,7 +832,7 @@ class StdDataConstructor():
         # Set site and instance of metadata manager
         self.site = site
         self.error_on_missing = error_on_missing
-        self.md_mngr = mh.MetaDataManager(site=site, variable_map='vis')
+        self.md_mngr = mh.get_metadata_manager(site=site, variable_map='vis')
 
         # If requested, set flux file date constraints on merged file
         start_date, end_date = None, None
@@ -970,7 +1058,7 @@ def write_to_std_file(site: str, concat_files: bool=True) -> None:
     logger.info(f'Writing data to file {file_path.name}')
 
     # Rewrite info line to reflect the fact that tables are merged
-    info = io.FILE_CONFIGS['TOA5']['dummy_info'][:-1]
+    info = TOA5_CONFIGS['dummy_info'][:-1]
     info.append('merged')
     info = dict(zip(io.INFO_FIELD_NAMES, info))
 
@@ -1016,12 +1104,6 @@ def append_to_std_file(site: str) -> None:
 
     logger.info(f'Beginning append for site {site}!')
 
-    # Get the data and format as TOA5
-    new_data = io.reformat_data(
-        data=data_const.parse_data(),
-        output_format='TOA5'
-        )
-
     # Get information for existing standardised data record
     file_end_date = (
         io.get_start_end_dates(
@@ -1031,36 +1113,42 @@ def append_to_std_file(site: str) -> None:
         ['end_date']
         )
 
-    # Check to see if any new data exists relative to existing file
-    append_data = new_data.loc[file_end_date:].drop(file_end_date)
-    if len(append_data) == 0:
+    # Check to see if any new data exists relative to existing file (index is
+    # monotonic after merge, so binary search the unparsed index for the first
+    # later record, and bail out before doing any QC or reformatting)
+    append_from = data_const.data.index.searchsorted(
+        file_end_date, side='right'
+        )
+    if append_from == len(data_const.data):
         logger.info('No new data to append')
         return
 
+    # Get the new data and format as TOA5
+    append_data = io.reformat_data(
+        data=data_const.parse_data().iloc[append_from:],
+        output_format='TOA5'
+        )
+
     logger.info(f'Found {len(append_data)} records to append...')
 
-    # Cross-check header content
-    existing_headers = io.get_header_df(file=file_path).reset_index()
-    new_headers = (
-        io.reformat_headers(
-            headers=data_const.parse_headers(),
-            output_format='TOA5'
-            )
-        .reset_index()
+    # Cross-check header content (compare as text - headers rebuilt from the
+    # configs can have object columns where those read from file are str)
+    existing_headers = io.get_header_df(file=file_path)
+    new_headers = io.reformat_headers(
+        headers=data_const.parse_headers(),
+        output_format='TOA5'
         )
-    for column in existing_headers:
-        if not all(new_headers==existing_headers):
-            raise RuntimeError(
-                f'header row {column} in new data does not match header row '
-                'in existing file!'
-                )
+    if not new_headers.astype(str).equals(existing_headers.astype(str)):
+        raise RuntimeError(
+            'header rows in new data do not match header rows in existing '
+            'file!'
+            )
 
     # Append to existing
-    file_configs = io.FILE_CONFIGS['TOA5']
     append_data.to_csv(
         path_or_buf=file_path, mode='a', header=False, index=False,
-        na_rep=file_configs['na_values'], sep=file_configs['separator'],
-        quoting=file_configs['quoting']
+        na_rep=TOA5_CONFIGS['na_values'], sep=TOA5_CONFIGS['separator'],
+        quoting=TOA5_CONFIGS['quoting']
         )
 #------------------------------------------------------------------------------
 
@@ -1134,42 +1222,65 @@ def merge_data(
 
     """
         
-    data_list, header_list = [], []
-    for file in files:
-       
-        # If type is dict, use dict keys as variable map
-        try:
-            usecols = files[file]
-        except TypeError:
-            usecols = None
-
-        # Get file type, and disable file concatenation for all EddyPro files
-        file_type = io.get_file_type(file=file)
-        do_concat = concat_files == True
-        if file_type == 'EddyPro':
-            do_concat = False
-
-        # Get the data handler
-        data_handler = fh.DataHandler(file=file, concat_files=do_concat)
-
-        # Append data and headers to lists
-        data_list.append(
-            data_handler.get_conditioned_data(
-                usecols=usecols,
-                drop_non_numeric=True,
-                monotonic_index=True,
-                resample_intvl=interval
+    # If type is dict, use dict keys as variable map
+    file_list = list(files)
+    try:
+        usecols_list = [files[file] for file in file_list]
+    except TypeError:
+        usecols_list = [None] * len(file_list)
+
+    # Get the conditioned data and headers for each file (file reads are
+    # mostly I/O and C-level parsing, so a thread pool overlaps them; map
+    # preserves the file order)
+    n_workers = max(1, min(MERGE_MAX_WORKERS, len(file_list)))
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        rslt = list(
+            executor.map(
+                functools.partial(
+                    _get_conditioned_file_data,
+                    concat_files=concat_files,
+                    interval=interval
+                    ),
+                file_list,
+                usecols_list
                 )
             )
-        header_list.append(
-            data_handler.get_conditioned_headers(
-                usecols=usecols, drop_non_numeric=True
-                )
-            )         
-    
-    # Concatenate lists
-    headers = pd.concat(header_list).fillna('')
-    data = pd.concat(data_list, axis=1)
+    data_list = [data for data, headers in rslt]
+    header_list = [headers for data, headers in rslt]
+
+    # Concatenate header list (if all headers have the same columns, just stack
+    # the underlying arrays)
+    if all(
+            df.columns.equals(header_list[0].columns) for df in header_list[1:]
+            ):
+        headers = pd.DataFrame(
+            np.vstack([df.to_numpy() for df in header_list]),
+            index=pd.Index(
+                np.hstack([df.index.to_numpy() for df in header_list]),
+                name=header_list[0].index.name
+                ),
+            columns=header_list[0].columns,
+            copy=False
+            )
+    else:
+        headers = pd.concat(header_list)
+    headers = headers.fillna('')
+
+    # Concatenate data list (if the data indices are all aligned and there are
+    # no duplicate column names, build the frame directly from the columns and
+    # skip the concat alignment)
+    data_cols = [col for df in data_list for col in df.columns]
+    if (
+            len(data_cols) == len(set(data_cols)) and
+            all(df.index.equals(data_list[0].index) for df in data_list[1:])
+            ):
+        data = pd.DataFrame(
+            {col: series for df in data_list for col, series in df.items()},
+            index=data_list[0].index,
+            copy=False
+            )
+    else:
+        data = pd.concat(data_list, axis=1)
 
     # Apply date constraints
     if start_date is not None:
@@ -1181,6 +1292,52 @@ def merge_data(
     return {'headers': headers, 'data': data}
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def _get_conditioned_file_data(
+        file: pathlib.Path | str, usecols: list | dict=None,
+        concat_files: bool=False, interval=None
+        ) -> tuple:
+    """
+    Get the conditioned data and headers for a single file.
+
+    Args:
+        file: the absolute path of the file to parse.
+        usecols (optional): the variables to return, or a dictionary mapping
+            translation of variable names (see file handler documentation).
+            Defaults to None.
+        concat_files (optional): concat backup files to current (ignored for
+            EddyPro files). Defaults to False.
+        interval (optional): resample file to passed interval. Defaults to
+            None.
+
+    Returns:
+        the data and headers.
+
+    """
+
+    # Get file type, and disable file concatenation for all EddyPro files
+    file_type = io.get_file_type(file=file)
+    do_concat = concat_files == True
+    if file_type == 'EddyPro':
+        do_concat = False
+
+    # Get the data handler
+    data_handler = fh.DataHandler(file=file, concat_files=do_concat)
+
+    # Return data and headers
+    return (
+        data_handler.get_conditioned_data(
+            usecols=usecols,
+            drop_non_numeric=True,
+            monotonic_index=True,
+            resample_intvl=interval
+            ),
+        data_handler.get_conditioned_headers(
+            usecols=usecols, drop_non_numeric=True
+            )
+        )
+#------------------------------------------------------------------------------
+
 ###############################################################################
 ### END GENERIC FUNCTIONS ###
 ###############################################################################
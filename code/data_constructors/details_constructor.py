@@ -24,6 +24,9 @@ LOGGER_SUBSET = [
     'format', 'station_name', 'logger_type', 'serial_num', 'OS_version',
     'program_name'
     ]
+TOA5_DUMMY_INFO = dict(
+    zip(io.INFO_FIELD_NAMES, io.FILE_CONFIGS['TOA5']['dummy_info'])
+    )
 #------------------------------------------------------------------------------
 
 # #------------------------------------------------------------------------------
@@ -49,9 +52,7 @@ def write_site_info(site: str) -> None:
 
     # Get site info
     logger.info('Getting site information...')
-    site_info = (
-        pm.get_local_config_file(config_stream='all_site_metadata')[site]
-        )
+    site_info = _get_all_site_metadata()[site].copy()
     site_info['start_year'] = str(
         dt.datetime.strptime(site_info['date_commissioned'], '%Y-%m-%d').year
         )
@@ -84,7 +85,7 @@ def write_site_info(site: str) -> None:
 
     # Get flux logger info
     logger.info('Getting flux logger information...')
-    md_mngr = mh.MetaDataManager(site=site, variable_map='vis')
+    md_mngr = mh.get_metadata_manager(site=site, variable_map='vis')
     file = md_mngr.get_variable_attributes(variable='Fco2', return_field='file')
     logger_info = md_mngr.get_file_attributes(file=file)[LOGGER_SUBSET].to_dict()
 
@@ -97,19 +98,17 @@ def write_site_info(site: str) -> None:
 
     # Collate
     logger.info('Collating sources...')
-    data = (
-        pd.DataFrame(
-            data=(
-                site_info |
-                sun_info |
-                fast_file_info |
-                logger_info |
-                missing_info
-                ),
-            index=[midnight_datetime]
-            )
-        .rename_axis('TIMESTAMP')
-        .reset_index()
+    data = pd.DataFrame.from_records(
+        [
+            {
+                'TIMESTAMP': midnight_datetime,
+                **site_info,
+                **sun_info,
+                **fast_file_info,
+                **logger_info,
+                **missing_info
+                }
+            ]
         )
 
     # Make the headers
@@ -120,8 +119,9 @@ def write_site_info(site: str) -> None:
     headers.loc['TIMESTAMP']=['TS', '']
 
     # Make the info
-    info = dict(zip(io.INFO_FIELD_NAMES, io.FILE_CONFIGS['TOA5']['dummy_info']))
-    info.update({'station_name': site, 'table_name': 'site_details'})
+    info = (
+        TOA5_DUMMY_INFO | {'station_name': site, 'table_name': 'site_details'}
+        )
 
     # Set the output path
     output_path = (
@@ -136,3 +136,26 @@ def write_site_info(site: str) -> None:
     io.write_data_to_file(
         headers=headers, data=data, abs_file_path=output_path, info=info)
 #------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+@io.cache_on_file_stats(
+    get_files=lambda: [
+        pm.get_local_stream_path(
+            resource='configs', stream='all_site_metadata'
+            )
+        ],
+    maxsize=1
+    )
+def _get_all_site_metadata() -> dict:
+    """
+    Get the metadata for all sites (cached on the modification time and size
+    of the metadata file, so it is only re-read after that file is edited -
+    callers must copy before altering any of the site dictionaries).
+
+    Returns:
+        the metadata, with site names as keys.
+
+    """
+
+    return pm.get_local_config_file(config_stream='all_site_metadata')
+#------------------------------------------------------------------------------
@@ -82,7 +82,7 @@ def _move_data(site: str, aux: bool=False) -> None:
 
     # Get the list of files
     logger.info('Getting file listing...')
-    files = sorted(list(file_path.glob(SEARCH_STR)))
+    files = sorted(file_path.glob(SEARCH_STR))
 
     if len(files) > 0:
 
@@ -95,14 +95,14 @@ class FileConcatenator():
                 .rename(self.alias_maps[file], axis=1)
                 )
         ordered_vars = self.get_concatenated_headers().index.tolist()
-        try:
-            return (
-                pd.concat(df_list)
-                [ordered_vars]
-                .sort_index()
+        data = pd.concat(df_list)
+        missing_vars = [var for var in ordered_vars if var not in data.columns]
+        if missing_vars:
+            raise RuntimeError(
+                'Concatenated data is missing header variables: '
+                f'{", ".join(missing_vars)}'
                 )
-        except KeyError:
-            breakpoint()
+        return data[ordered_vars].sort_index()
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
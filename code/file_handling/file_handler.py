@@ -246,15 +246,14 @@ class DataHandler():
         """
 
         data = self._get_non_duplicate_data()
-        complete_index = pd.date_range(
-            start=data.index[0],
-            end=data.index[-1],
-            freq=f'{self.interval}min'
+        n_expected = (
+            (data.index[-1] - data.index[0]) //
+            pd.Timedelta(minutes=self.interval) + 1
             )
-        n_missing = len(complete_index) - len(data)
+        n_missing = n_expected - len(data)
         return {
             'n_missing': n_missing,
-            'pct_missing': round(n_missing / len(complete_index) * 100, 2),
+            'pct_missing': round(n_missing / n_expected * 100, 2),
             }
     #--------------------------------------------------------------------------
 
@@ -326,7 +325,7 @@ class DataHandler():
 
         if self.interval is None:
             raise TypeError('Analysis not applicable to single record!')
-        dupes = self.get_duplicate_indices() | self.get_duplicate_records()
+        dupes = self.get_duplicate_records() | self.data.index.duplicated()
         return self.data[~dupes]
     #--------------------------------------------------------------------------
 
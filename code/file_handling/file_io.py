@@ -21,6 +21,7 @@ It does NOT evaluate data integrity!
 
 import csv
 import datetime as dt
+import functools
 import os
 from typing import Callable
 import yaml
@@ -45,6 +46,8 @@ INFO_FIELD_NAMES = [
 
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
+WRITE_BUFFER_SIZE = 1 << 20
+
 EDDYPRO_SEARCH_STR = 'EP-Summary'
 
 ###############################################################################
@@ -373,7 +376,9 @@ def write_data_to_file(
 
     # Write the data to file
     file_configs = get_file_type_configs(file_type=output_format)
-    with open(abs_file_path, 'w', newline='\n') as f:
+    with open(
+            abs_file_path, 'w', newline='\n', buffering=WRITE_BUFFER_SIZE
+            ) as f:
 
         # Write the header
         writer = csv.writer(
@@ -463,6 +468,42 @@ def write_yml(file: str | pathlib.Path, data: dict) -> None:
         return yaml.dump(data=data, stream=f, sort_keys=False)
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def cache_on_file_stats(get_files: Callable, maxsize: int=128) -> Callable:
+    """Decorator to memoize a function on its arguments AND on the
+    modification time and size of the files it reads, so that calls after any
+    of those files are edited miss the cache and re-read them.
+
+    Args:
+        get_files: function that accepts the same arguments as the decorated
+            function and returns the paths of the files its result depends on.
+        maxsize (optional): maximum number of cached results. Defaults to 128.
+
+    Returns:
+        the decorator (the decorated function exposes `cache_clear`).
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+
+        @functools.lru_cache(maxsize=maxsize)
+        def cached(file_stats: tuple, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            file_stats = tuple(
+                (stat.st_mtime_ns, stat.st_size) for stat in
+                map(os.stat, get_files(*args, **kwargs))
+                )
+            return cached(file_stats, *args, **kwargs)
+
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+
+    return decorator
+#------------------------------------------------------------------------------
+
 # #------------------------------------------------------------------------------
 # def get_file_n_lines(file):
 
@@ -894,7 +935,8 @@ def get_dates(file: str | pathlib.Path, file_type: str=None) -> list:
 
 #------------------------------------------------------------------------------
 def get_start_end_dates(file: str | pathlib.Path, file_type: str=None) -> dict:
-    """Get start and end dates only.
+    """Get start and end dates only. Results are cached against the file
+    modification time and size, so unchanged files are not re-scanned.
 
     Args:
         file: absolute path of file to parse.
@@ -906,6 +948,28 @@ def get_start_end_dates(file: str | pathlib.Path, file_type: str=None) -> dict:
 
     """
 
+    return dict(
+        _scan_start_end_dates(file=os.fspath(file), file_type=file_type)
+        )
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+@cache_on_file_stats(
+    get_files=lambda file, file_type=None: [file], maxsize=256
+    )
+def _scan_start_end_dates(file: str, file_type: str=None) -> dict:
+    """Scan the file for the first and last valid dates.
+
+    Args:
+        file: absolute path of file to parse.
+        file_type (optional): if specified, must be either `TOA5` or
+            `EddyPro`. If None, file_type is fetched. Defaults to None.
+
+    Returns:
+        dictionary containing start and end dates.
+
+    """
+
     # If file type not supplied, detect it.
     if not file_type:
         file_type = get_file_type(file)
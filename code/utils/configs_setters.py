@@ -670,7 +670,6 @@ def PFPL1XlToYml_old(site: str):
         .drop(['long_name', 'standard_name'], axis=1)
         )
 
-    breakpoint()
     with open(
             file=variable_path / f'{site}_variables.yml', mode='w',
             encoding='utf-8'
@@ -14,7 +14,9 @@ Todo:
 
 """
 
+import numpy as np
 import pandas as pd
+import re
 
 from paths import paths_manager as pm
 import file_handling.file_io as io
@@ -27,6 +29,8 @@ VALID_SUFFIXES = {
     'Av': 'average', 'Sd': 'standard deviation', 'Vr': 'variance', 'Sum': 'Sum'
     }
 _NAME_MAP = {'site_name': 'name', 'std_name': 'std_name'}
+FAST_FILE_SEARCH_STR = 'TOB3*.dat'
+FAST_MONTH_DIR_REGEX = re.compile(r'^\d{4}_\d{2}$')
 
 ###############################################################################
 ### BEGIN SINGLE SITE CONFIGURATION READER SECTION ###
@@ -97,8 +101,10 @@ class MetaDataManager():
             .pipe(self._test_file_assignment)
             )
         
-        self.site_variables = df[~df.missing]
-        self.missing_variables = df[df.missing]
+        # Split on positions of the missing flags (avoids boolean alignment)
+        missing = df.missing.to_numpy(dtype=bool)
+        self.site_variables = df.iloc[np.flatnonzero(~missing)]
+        self.missing_variables = df.iloc[np.flatnonzero(missing)]
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
@@ -115,7 +121,7 @@ class MetaDataManager():
         """
 
         # Get the name parser, check all names and preserve additional properties
-        name_parser = PFPNameParser()
+        name_parser = _get_name_parser()
         props_df = (
             pd.DataFrame(
                 [
@@ -236,15 +242,14 @@ class MetaDataManager():
 
         """
 
-        rslt = (
-            io.get_file_info(file=self.data_path / file) |
+        rslt = io.get_file_info(file=self.data_path / file)
+        rslt.update(
             self._get_file_dates(file=file, include_backups=include_backups)
-            # io.get_start_end_dates(file=self.data_path / file)
             )
         if include_extended:
             rslt.update(
-                {'interval': io.get_file_interval(self.data_path / file)} |
-                {'backups': io.get_eligible_concat_files(self.data_path / file)}
+                interval=io.get_file_interval(self.data_path / file),
+                backups=io.get_eligible_concat_files(self.data_path / file)
                 )
         if return_field is None:
             return pd.Series(rslt)    
@@ -670,10 +675,26 @@ class PFPNameParser():
             .T
             .rename_axis('quantity')
             )
+        self._parsed_names = {}
     #--------------------------------------------------------------------------
 
     #--------------------------------------------------------------------------
     def parse_variable_name(self, variable_name: str) -> dict:
+        """
+        Memoized wrapper around _parse_variable_name (names repeat across
+        sites, so each is parsed once; a copy of the cached result is
+        returned).
+        """
+
+        if not variable_name in self._parsed_names:
+            self._parsed_names[variable_name] = self._parse_variable_name(
+                variable_name=variable_name
+                )
+        return self._parsed_names[variable_name].copy()
+    #--------------------------------------------------------------------------
+
+    #--------------------------------------------------------------------------
+    def _parse_variable_name(self, variable_name: str) -> dict:
         """
         Break variable name into components and parse each for conformity.
 
@@ -897,6 +918,35 @@ class PFPNameParser():
 
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+@io.cache_on_file_stats(
+    get_files=lambda site, variable_map='pfp': _get_metadata_manager_files(
+        site=site, variable_map=variable_map
+        ),
+    maxsize=64
+    )
+def get_metadata_manager(
+        site: str, variable_map: str='pfp'
+        ) -> MetaDataManager:
+    """
+    Get the metadata manager for a site (memoized on the modification time and
+    size of the site variable configuration file and the pfp std names yml, so
+    repeat calls reuse the already-parsed configuration until either file is
+    edited - callers must not alter the returned manager).
+
+    Args:
+        site: name of site.
+        variable_map (optional): which variable configuration ('pfp' or 'vis')
+        to use. Defaults to 'pfp'.
+
+    Returns:
+        the metadata manager.
+
+    """
+
+    return MetaDataManager(site=site, variable_map=variable_map)
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 def get_last_10Hz_file(site):
 
@@ -913,12 +963,28 @@ def get_last_10Hz_file(site):
     except FileNotFoundError:
         return dummy_response
 
-    # Get file and age in days
-    try:
-        #return max(data_path.rglob('TOB3*.dat'), key=os.path.getctime).name
-        return sorted([file.name for file in data_path.rglob('TOB3*.dat')])[-1]
-    except IndexError:
+    # Files not yet filed sit in the stream root or TMP; filed files sit in
+    # YYYY_MM directories, so only the newest non-empty month needs scanning
+    names = [
+        file.name for path in (data_path, data_path / 'TMP')
+        for file in path.glob(FAST_FILE_SEARCH_STR)
+        ]
+    month_dirs = sorted(
+        (path for path in data_path.iterdir()
+         if path.is_dir() and FAST_MONTH_DIR_REGEX.match(path.name)),
+        key=lambda path: path.name,
+        reverse=True
+        )
+    for month_dir in month_dirs:
+        month_names = [
+            file.name for file in month_dir.glob(FAST_FILE_SEARCH_STR)
+            ]
+        if month_names:
+            names += month_names
+            break
+    if not names:
         return dummy_response
+    return max(names)
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
@@ -935,6 +1001,53 @@ def convert_units_to_variance(units):
     return ref_dict[units]
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+def _get_metadata_manager_files(site: str, variable_map: str) -> list:
+    """
+    Get the configuration files a metadata manager is built from (the site
+    variable configuration, and the pfp std names yml that supplies standard
+    units and plausible limits).
+
+    Args:
+        site: name of site.
+        variable_map: which variable configuration ('pfp' or 'vis') to use.
+
+    Returns:
+        the file paths.
+
+    """
+
+    return [
+        pm.get_local_stream_path(
+            resource='configs',
+            stream=f'variables_{variable_map}',
+            site=site
+            ),
+        pm.get_local_stream_path(resource='configs', stream='pfp_std_names')
+        ]
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+@io.cache_on_file_stats(
+    get_files=lambda: [
+        pm.get_local_stream_path(resource='configs', stream='pfp_std_names')
+        ],
+    maxsize=1
+    )
+def _get_name_parser() -> PFPNameParser:
+    """
+    Get a shared name parser (avoids re-reading the std names yml per site;
+    cached on the modification time and size of the yml, so edits to it are
+    picked up on the next call).
+
+    Returns:
+        the parser.
+
+    """
+
+    return PFPNameParser()
+#------------------------------------------------------------------------------
+
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------